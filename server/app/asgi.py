@@ -13,4 +13,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after Django is set up, since it pulls in models.
+from app.asgi_ip_block import IPBlockASGIMiddleware  # noqa: E402
+
+application = IPBlockASGIMiddleware(django_application)
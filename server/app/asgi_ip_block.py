@@ -0,0 +1,101 @@
+"""
+ASGI middleware that rejects blocked IPs before Django sees the request.
+
+Wrapping the Django ASGI application means a blocked client is turned away
+without paying for request construction, the Django middleware chain, URL
+routing or DRF setup. The `IPBlockMiddleware` Django middleware stays in
+place for WSGI deployments and skips requests this layer has already checked.
+"""
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework import status
+
+from utils.blocked_ip import (
+    ACCESS_DENIED_BODY,
+    BAD_REQUEST_BODY,
+    is_ip_in_db_blocklist,
+    lookup_local_blocklist,
+    preload_local_blocklist,
+)
+from utils.ip_detection import get_client_ip_from_scope
+
+# Set on the scope once the IP has been checked, so the Django middleware
+# doesn't repeat the work.
+IP_BLOCK_CHECKED_SCOPE_KEY = "ip_block_checked"
+
+# Static assets are public and requested many times per page load, so they
+# skip the IP lookup entirely.
+IP_BLOCK_EXEMPT_PATH_PREFIXES = tuple(
+    prefix
+    for prefix in (settings.STATIC_URL, settings.MEDIA_URL, "/favicon.ico")
+    if prefix
+)
+
+
+async def _send_json(send, status_code, body):
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class IPBlockASGIMiddleware:
+    """
+    Pure ASGI counterpart of `app.middlewares.IPBlockMiddleware`.
+
+    The in-memory blocklist answers most requests without leaving the event
+    loop; only unbuilt blocklists and bloom filter hits fall back to the
+    synchronous Redis/database check in a worker thread.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        if scope["type"] != "http" or scope["path"].startswith(
+            IP_BLOCK_EXEMPT_PATH_PREFIXES
+        ):
+            return await self.app(scope, receive, send)
+
+        request_ip = get_client_ip_from_scope(scope)
+        if not request_ip:
+            # In development, allow requests to proceed even if IP detection fails
+            if not settings.DEBUG:
+                return await _send_json(
+                    send, status.HTTP_400_BAD_REQUEST, BAD_REQUEST_BODY
+                )
+        else:
+            is_blocked = lookup_local_blocklist(request_ip)
+            if is_blocked is None:
+                is_blocked = await sync_to_async(is_ip_in_db_blocklist)(request_ip)
+            if is_blocked:
+                return await _send_json(
+                    send, status.HTTP_403_FORBIDDEN, ACCESS_DENIED_BODY
+                )
+
+        # Middleware must not mutate the scope it was given; pass a copy.
+        return await self.app(
+            {**scope, IP_BLOCK_CHECKED_SCOPE_KEY: True}, receive, send
+        )
+
+    async def _lifespan(self, receive, send):
+        # Django doesn't implement the lifespan protocol, so it is answered
+        # here. Start-up is used to build the blocklist before serving traffic.
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await sync_to_async(preload_local_blocklist)()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
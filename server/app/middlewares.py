@@ -1,12 +1,25 @@
 from django.conf import settings
-from django.http import JsonResponse
+from django.http import HttpRequest, HttpResponse
 from django.utils.deprecation import MiddlewareMixin
 from rest_framework import status
 
-from utils.blocked_ip import is_ip_in_db_blocklist
+from app.asgi_ip_block import (
+    IP_BLOCK_CHECKED_SCOPE_KEY,
+    IP_BLOCK_EXEMPT_PATH_PREFIXES,
+)
+from utils.blocked_ip import (
+    ACCESS_DENIED_BODY,
+    BAD_REQUEST_BODY,
+    is_ip_in_db_blocklist,
+)
 from utils.ip_detection import get_client_ip_only
 
 
+def _json_response(body: bytes, status_code: int) -> HttpResponse:
+    # The payloads are static, so only the response object is built per request.
+    return HttpResponse(body, status=status_code, content_type="application/json")
+
+
 class IPBlockMiddleware(MiddlewareMixin):
     """
     Highly efficient middleware that checks if a client's IP is permanently blocked.
@@ -20,9 +33,20 @@ class IPBlockMiddleware(MiddlewareMixin):
     4.  If the IP is found to be blocked (either from cache or DB), the request
         is immediately rejected with a 403 Forbidden response.
     5.  Otherwise, the request proceeds to the next middleware or view.
+
+    Under ASGI the same check already ran in `IPBlockASGIMiddleware` before
+    Django was reached, so those requests are skipped here.
     """
 
-    def process_request(self, request):
+    def process_request(self, request: HttpRequest) -> HttpResponse | None:
+        scope = getattr(request, "scope", None)
+        if scope is not None and scope.get(IP_BLOCK_CHECKED_SCOPE_KEY):
+            return None
+
+        # Static assets and other exempt paths skip the lookup entirely.
+        if request.path_info.startswith(IP_BLOCK_EXEMPT_PATH_PREFIXES):
+            return None
+
         # 1. Get the client IP using centralized IP detection
         request_ip = get_client_ip_only(request)
         # In development mode, be more lenient about IP detection failures
@@ -32,24 +56,12 @@ class IPBlockMiddleware(MiddlewareMixin):
                 return None
             else:
                 # In production, deny requests with undetectable IPs for security
-                return JsonResponse(
-                    {
-                        "error": True,
-                        "message": "Unable to process your request.",
-                    },
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
+                return _json_response(BAD_REQUEST_BODY, status.HTTP_400_BAD_REQUEST)
 
         # 2. Check if the IP is blocked using the efficient, cached function.
         if is_ip_in_db_blocklist(request_ip):
             # 3. Block immediately with a generic message if blocked.
-            return JsonResponse(
-                {
-                    "error": True,
-                    "message": "Access denied. Please contact support.",
-                },
-                status=status.HTTP_403_FORBIDDEN,
-            )
+            return _json_response(ACCESS_DENIED_BODY, status.HTTP_403_FORBIDDEN)
 
         # 4. If not blocked, allow the request to continue.
         return None
@@ -26,7 +26,15 @@ DEBUG = os.getenv("DJANGO_DEBUG", "False").lower() in ("true", "1", "t")
 
 # A list of allowed hosts for this Django site. In production, this should be
 # set to the domain name of your site.
-ALLOWED_HOSTS = os.getenv("DJANGO_ALLOWED_HOSTS", "localhost,127.0.0.1").split(",")
+# Stripped and de-duplicated so Django's per-request host check scans as few
+# patterns as possible (and "a.com, b.com" doesn't silently reject b.com).
+ALLOWED_HOSTS = list(
+    dict.fromkeys(
+        host.strip()
+        for host in os.getenv("DJANGO_ALLOWED_HOSTS", "localhost,127.0.0.1").split(",")
+        if host.strip()
+    )
+)
 
 
 # ==============================================================================
@@ -103,6 +111,10 @@ TEMPLATES = [
 # DATABASE CONFIGURATION
 # ==============================================================================
 
+# Set DB_PGBOUNCER to true when DB_HOST/DB_PORT point at PgBouncer running in
+# transaction pooling mode (pool_mode=transaction).
+DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "False").lower() in ("true", "1", "t")
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -111,7 +123,12 @@ DATABASES = {
         "PASSWORD": os.getenv("DB_PASSWORD"),
         "HOST": os.getenv("DB_HOST"),
         "PORT": os.getenv("DB_PORT", "5432"),
-        "CONN_MAX_AGE": 60,
+        # Connections to PgBouncer are cheap to hold, so keep them for the life
+        # of the worker instead of reconnecting (TCP + auth) every 60 seconds.
+        "CONN_MAX_AGE": None if DB_PGBOUNCER else 60,
+        # Transaction pooling may hand each transaction a different server
+        # connection, which breaks server-side (named) cursors.
+        "DISABLE_SERVER_SIDE_CURSORS": DB_PGBOUNCER,
     }
 }
 
@@ -167,10 +184,14 @@ AUTH_USER_MODEL = "users.User"
 # CACHING (REDIS) AND SESSIONS
 # ==============================================================================
 
-# Redis connection URL with fallback for development
+# Redis connection URL with fallback for development.
+# When Redis runs on the same host, a unix socket skips the TCP stack:
+# REDIS_URL=unix:///var/run/redis/redis.sock?db=1
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/1")
 
-# Robust Redis caching configuration
+# Robust Redis caching configuration.
+# Replies are parsed by the hiredis C parser, which redis-py picks up
+# automatically when the `hiredis` package is installed.
 CACHES = {
     "default": {
         "BACKEND": "django_redis.cache.RedisCache",
@@ -181,7 +202,10 @@ CACHES = {
             "SOCKET_TIMEOUT": 5,  # 5 seconds socket timeout
             "RETRY_ON_TIMEOUT": True,  # Retry on connection failures
             "IGNORE_EXCEPTIONS": not DEBUG,  # Only ignore exceptions in production
-            "MAX_CONNECTIONS": 100,  # Maximum pool connections
+            "CONNECTION_POOL_KWARGS": {
+                "max_connections": 100,  # Maximum pool connections
+                "health_check_interval": 30,  # Revalidate idle pooled sockets
+            },
             "PICKLE_VERSION": -1,  # Use highest pickle protocol
         },
         "KEY_PREFIX": "django",  # Namespace cache keys
@@ -194,7 +218,9 @@ SESSION_CACHE_ALIAS = "default"
 
 # Session configuration optimized for Redis
 SESSION_COOKIE_AGE = 1209600  # 2 weeks in seconds
-SESSION_SAVE_EVERY_REQUEST = True
+# Only write the session back to Redis when it was actually modified, so
+# read-only requests don't cost an extra SET.
+SESSION_SAVE_EVERY_REQUEST = False
 
 
 # ==============================================================================
@@ -204,10 +230,15 @@ SESSION_SAVE_EVERY_REQUEST = True
 # Celery configuration with Redis as broker and result backend
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/0")
-CELERY_ACCEPT_CONTENT = ["json"]
-CELERY_TASK_SERIALIZER = "json"
-CELERY_RESULT_SERIALIZER = "json"
+# msgpack is smaller and faster to (de)serialize than JSON; JSON is still
+# accepted so messages queued by an older deploy can be consumed.
+CELERY_ACCEPT_CONTENT = ["msgpack", "json"]
+CELERY_TASK_SERIALIZER = "msgpack"
+CELERY_RESULT_SERIALIZER = "msgpack"
 CELERY_TIMEZONE = TIME_ZONE
+# Tasks are fire-and-forget; opt in with @shared_task(ignore_result=False)
+# for the ones whose return value is actually read.
+CELERY_TASK_IGNORE_RESULT = True
 
 # Celery task configuration for better performance and reliability
 CELERY_TASK_ALWAYS_EAGER = DEBUG  # Execute tasks synchronously in development
@@ -218,6 +249,21 @@ CELERY_WORKER_PREFETCH_MULTIPLIER = 1  # Process one task at a time
 CELERY_WORKER_MAX_TASKS_PER_CHILD = 100  # Restart worker after 100 tasks
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
 
+# OTP emails get their own queue so a backlog of other tasks never delays a
+# login; workers must consume it too (`celery -A app worker -Q celery,otp`).
+CELERY_TASK_ROUTES = {
+    "utils.send_email_helper.send_otp": {"queue": "otp"},
+    "utils.send_email_helper.send_otp_bulk": {"queue": "otp"},
+}
+
+# Periodic tasks (run with `celery -A app beat`)
+CELERY_BEAT_SCHEDULE = {
+    "cleanup-expired-trusted-devices": {
+        "task": "two_factor.tasks.cleanup_expired_trusted_devices",
+        "schedule": 60 * 60,  # Hourly
+    },
+}
+
 
 # ==============================================================================
 # THIRD-PARTY LIBRARIES CONFIGURATION
@@ -235,21 +281,21 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
-    # Parsers & Renderers
+    # Parsers & Renderers (orjson is several times faster than stdlib json)
     "DEFAULT_PARSER_CLASSES": [
-        "rest_framework.parsers.JSONParser",
+        "drf_orjson_renderer.parsers.ORJSONParser",
         "rest_framework.parsers.FormParser",
         "rest_framework.parsers.MultiPartParser",
     ],
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
+        "drf_orjson_renderer.renderers.ORJSONRenderer",
         # "rest_framework.renderers.BrowsableAPIRenderer",  # Disable in production
     ],
-    # Throttling (Rate Limiting)
+    # Throttling (Rate Limiting), counted atomically in Redis
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",  # For unauthenticated users (by IP)
-        "rest_framework.throttling.UserRateThrottle",  # For authenticated users (by user ID)
-        "rest_framework.throttling.ScopedRateThrottle",  # For specific, sensitive views
+        "utils.throttling.AnonRateThrottle",  # For unauthenticated users (by IP)
+        "utils.throttling.UserRateThrottle",  # For authenticated users (by user ID)
+        "utils.throttling.ScopedRateThrottle",  # For specific, sensitive views
     ],
     "DEFAULT_THROTTLE_RATES": {},  # Defined below based on DEBUG status
     # Filtering, Search & Ordering
@@ -258,8 +304,8 @@ REST_FRAMEWORK = {
         "rest_framework.filters.SearchFilter",
         "rest_framework.filters.OrderingFilter",
     ],
-    # Pagination
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    # Pagination (keyset/cursor based, so deep pages don't scan skipped rows)
+    "DEFAULT_PAGINATION_CLASS": "utils.pagination.CreatedAtCursorPagination",
     "PAGE_SIZE": 20,
     # Versioning (Optional - enables v1/v2 namespacing)
     "DEFAULT_VERSIONING_CLASS": "rest_framework.versioning.NamespaceVersioning",
@@ -273,6 +319,9 @@ if DEBUG:
         "rest_framework.renderers.BrowsableAPIRenderer"
     )
 
+    # Print emails, OTPs included, to the console instead of sending them.
+    EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+
     # Development-specific Redis settings
     CACHES["default"]["OPTIONS"]["IGNORE_EXCEPTIONS"] = False
 
@@ -306,6 +355,10 @@ SIMPLE_JWT = {
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
     # Cryptographic Configuration
+    # HS256 is kept on purpose: PyJWT verifies it with the stdlib `hmac` module,
+    # whose SHA-256 already comes from OpenSSL (using SHA-NI / ARMv8 crypto
+    # instructions when the CPU has them). Asymmetric algorithms such as EdDSA
+    # are slower to verify and only pay off when other services verify tokens.
     "ALGORITHM": "HS256",
     "SIGNING_KEY": SECRET_KEY,  # Uses Django's secret key for signing
     # Header Configuration
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
 
 application = get_wsgi_application()
+
+# Build the IP blocklist now rather than on the first request. With
+# `gunicorn --preload` this runs once before forking and is shared by workers.
+from utils.blocked_ip import preload_local_blocklist  # noqa: E402
+
+preload_local_blocklist()
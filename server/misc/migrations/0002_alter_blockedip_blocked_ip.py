@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-15 09:12
+
+import utils.model_fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('misc', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='blockedip',
+            name='blocked_ip',
+            field=utils.model_fields.InetField(max_length=43, unique=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-15 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('misc', '0002_alter_blockedip_blocked_ip'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='blockedip',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Created at'),
+        ),
+    ]
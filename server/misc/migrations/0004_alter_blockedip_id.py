@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-15 14:05
+
+from django.db import migrations, models
+import utils.uuid7
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('misc', '0003_alter_blockedip_created_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='blockedip',
+            name='id',
+            field=models.UUIDField(default=utils.uuid7.uuid7, editable=False, primary_key=True, serialize=False, verbose_name='Unique identifier'),
+        ),
+    ]
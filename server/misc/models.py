@@ -1,11 +1,13 @@
 from django.db import models
 
+from utils.model_fields import InetField
 from utils.models_mixin import BaseModelWithSoftDelete
 
 
 # Create your models here.
 class BlockedIP(BaseModelWithSoftDelete):
-    blocked_ip = models.CharField(max_length=255, unique=True)
+    # A single IP ("1.2.3.4") or a CIDR range ("1.2.3.0/24").
+    blocked_ip = InetField(unique=True)
     blocked_at = models.DateTimeField(auto_now_add=True)
     is_blocked = models.BooleanField(default=True)
 
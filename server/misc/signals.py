@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from utils.blocked_ip import (
+    apply_blocklist_change,
+    cache_block_status,
+    publish_blocklist_change,
+)
+
+from .models import BlockedIP
+
+
+def _sync_blocklist(action, blocked_ip):
+    # Ranges are matched in-process only; single IPs are cached in Redis.
+    if "/" not in blocked_ip:
+        cache_block_status(blocked_ip, action == "block")
+    apply_blocklist_change(action, blocked_ip)
+    publish_blocklist_change(action, blocked_ip)
+
+
+@receiver(post_save, sender=BlockedIP)
+def blocked_ip_saved(sender, instance, **kwargs):
+    """Keeps every process' in-memory blocklist in sync with the table."""
+    _sync_blocklist("block" if instance.is_blocked else "unblock", instance.blocked_ip)
+
+
+@receiver(post_delete, sender=BlockedIP)
+def blocked_ip_deleted(sender, instance, **kwargs):
+    _sync_blocklist("unblock", instance.blocked_ip)
@@ -1,3 +1,361 @@
-from django.test import TestCase
+import uuid
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, SimpleTestCase
+from redis.exceptions import RedisError
+
+from utils import blocked_ip, throttling
+from utils.bloom_filter import BloomFilter
+from utils.ip_detection import (
+    _parse_ip,
+    get_client_ip_address,
+    get_client_ip_from_scope,
+)
+from utils.ip_prefix_table import IPPrefixTable
+from utils.uuid7 import uuid7
+
+
+class BloomFilterTests(SimpleTestCase):
+    def test_added_items_are_always_found(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        items = [f"10.0.{i // 256}.{i % 256}" for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+
+        for item in items:
+            self.assertIn(item, bloom)
+
+    def test_accepts_str_and_bytes(self):
+        bloom = BloomFilter(capacity=10)
+        bloom.add("1.2.3.4")
+        bloom.add(b"5.6.7.8")
+
+        self.assertIn(b"1.2.3.4", bloom)
+        self.assertIn("5.6.7.8", bloom)
+
+    def test_empty_filter_contains_nothing(self):
+        bloom = BloomFilter(capacity=10)
+
+        self.assertNotIn("1.2.3.4", bloom)
+
+    def test_false_positive_rate_stays_near_target(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"blocked-{i}")
+
+        false_positives = sum(f"allowed-{i}" in bloom for i in range(10_000))
+
+        self.assertLess(false_positives, 300)
+
+    def test_sizing(self):
+        bloom = BloomFilter(capacity=100_000, error_rate=0.001)
+
+        # ~14.4 bits and ~10 hashes per item for a 0.1% false-positive rate.
+        self.assertEqual(bloom.num_hashes, 10)
+        self.assertAlmostEqual(bloom.num_bits / 100_000, 14.38, places=1)
+        self.assertEqual(len(bloom._bits), (bloom.num_bits + 7) // 8)
+
+    def test_degenerate_sizes_are_clamped(self):
+        bloom = BloomFilter(capacity=0, error_rate=0.5)
+
+        self.assertGreaterEqual(bloom.num_bits, 8)
+        self.assertGreaterEqual(bloom.num_hashes, 1)
+
+
+class IPPrefixTableTests(SimpleTestCase):
+    def test_empty_table(self):
+        table = IPPrefixTable()
+
+        self.assertFalse(table)
+        self.assertNotIn("10.0.0.1", table)
+
+    def test_containment_across_prefix_lengths(self):
+        table = IPPrefixTable()
+        table.insert("10.0.0.0/8")
+        table.insert("192.168.1.0/24")
+        table.insert("203.0.113.7")
+
+        self.assertTrue(table)
+        self.assertIn("10.255.1.2", table)
+        self.assertIn("192.168.1.200", table)
+        self.assertNotIn("192.168.2.1", table)
+        self.assertIn("203.0.113.7", table)
+        self.assertNotIn("203.0.113.8", table)
+        self.assertNotIn("11.0.0.1", table)
+
+    def test_host_bits_in_network_are_ignored(self):
+        table = IPPrefixTable()
+        table.insert("172.16.5.9/16")
+
+        self.assertIn("172.16.200.1", table)
+
+    def test_ipv4_and_ipv6_are_kept_apart(self):
+        table = IPPrefixTable()
+        table.insert("0.0.0.0/0")
+        table.insert("2001:db8::/32")
+
+        self.assertIn("8.8.8.8", table)
+        self.assertIn("2001:db8:1::5", table)
+        self.assertNotIn("2001:db9::1", table)
+        self.assertNotIn("::ffff:0:1", table)
+
+    def test_delete_unblocks_only_that_network(self):
+        table = IPPrefixTable()
+        table.insert("10.0.0.0/8")
+        table.insert("10.1.0.0/16")
+        table.insert("2001:db8::/32")
+
+        table.delete("10.0.0.0/8")
+
+        self.assertNotIn("10.2.0.1", table)
+        self.assertIn("10.1.0.1", table)
+
+        table.delete("10.1.0.0/16")
+        table.delete("2001:db8::/32")
+
+        self.assertNotIn("10.1.0.1", table)
+        self.assertFalse(table)
+
+    def test_deleting_an_unknown_network_is_a_no_op(self):
+        table = IPPrefixTable()
+        table.insert("10.0.0.0/8")
+
+        table.delete("192.168.0.0/16")
+
+        self.assertIn("10.0.0.1", table)
+
+    def test_invalid_input_raises_value_error(self):
+        table = IPPrefixTable()
+
+        with self.assertRaises(ValueError):
+            table.insert("10.0.0.0/33")
+        with self.assertRaises(ValueError):
+            "not-an-ip" in table
+
+
+class ParseIPTests(SimpleTestCase):
+    def test_valid_addresses(self):
+        self.assertEqual(_parse_ip("8.8.8.8"), ("8.8.8.8", True))
+        self.assertEqual(_parse_ip("10.0.0.1"), ("10.0.0.1", False))
+        self.assertEqual(_parse_ip("::1"), ("::1", False))
+
+    def test_returns_canonical_form(self):
+        self.assertEqual(_parse_ip("2001:DB8::1"), ("2001:db8::1", False))
+        self.assertEqual(
+            _parse_ip("2606:4700:0:0:0:0:0:1111"), ("2606:4700::1111", True)
+        )
+
+    def test_rejects_malformed_values(self):
+        for value in ("cafe", "deadbeef", "1.2.3", "999.1.1.1", ":::", "a:b", ""):
+            with self.subTest(value=value):
+                self.assertIsNone(_parse_ip(value))
+
+
+class ClientIPFromScopeTests(SimpleTestCase):
+    def scope(self, headers=(), client=("9.9.9.9", 1234)):
+        return {"type": "http", "headers": list(headers), "client": client}
+
+    def test_takes_left_most_forwarded_for_entry(self):
+        scope = self.scope([(b"x-forwarded-for", b" 8.8.8.8 , 10.0.0.1")])
+
+        self.assertEqual(get_client_ip_from_scope(scope), "8.8.8.8")
+
+    def test_header_order_wins_over_scope_order(self):
+        scope = self.scope(
+            [(b"x-real-ip", b"1.1.1.1"), (b"x-forwarded-for", b"8.8.8.8")]
+        )
+
+        self.assertEqual(get_client_ip_from_scope(scope), "8.8.8.8")
+
+    def test_malformed_header_falls_through_to_next_header(self):
+        scope = self.scope(
+            [(b"x-forwarded-for", b"999.1.1.1"), (b"cf-connecting-ip", b"1.1.1.1")]
+        )
+
+        self.assertEqual(get_client_ip_from_scope(scope), "1.1.1.1")
+
+    def test_falls_back_to_socket_peer(self):
+        self.assertEqual(
+            get_client_ip_from_scope(self.scope([(b"x-forwarded-for", b"cafe")])),
+            "9.9.9.9",
+        )
+        self.assertIsNone(get_client_ip_from_scope(self.scope(client=None)))
+
+    def test_normalizes_ipv6(self):
+        scope = self.scope([(b"x-real-ip", b"2001:DB8::1")])
+
+        self.assertEqual(get_client_ip_from_scope(scope), "2001:db8::1")
+
+
+class ClientIPAddressTests(SimpleTestCase):
+    def get(self, **headers):
+        return get_client_ip_address(
+            RequestFactory().get("/", REMOTE_ADDR="9.9.9.9", **headers)
+        )
+
+    def test_public_left_most_entry_takes_the_fast_path(self):
+        with mock.patch("utils.ip_detection.get_client_ip") as ipware:
+            self.assertEqual(
+                self.get(HTTP_X_FORWARDED_FOR="8.8.8.8, 10.0.0.1"),
+                ("8.8.8.8", True),
+            )
+        ipware.assert_not_called()
+
+    def test_private_left_most_entry_falls_through_to_ipware(self):
+        self.assertEqual(
+            self.get(
+                HTTP_X_FORWARDED_FOR="10.0.0.1, 8.8.8.8", HTTP_X_REAL_IP="8.8.4.4"
+            ),
+            ("8.8.4.4", True),
+        )
+        self.assertEqual(
+            self.get(HTTP_X_FORWARDED_FOR="10.0.0.1, 8.8.8.8"), ("10.0.0.1", False)
+        )
+
+    def test_result_is_memoized_on_the_request(self):
+        request = RequestFactory().get("/", HTTP_X_FORWARDED_FOR="8.8.8.8")
+        get_client_ip_address(request)
+        request.META["HTTP_X_FORWARDED_FOR"] = "1.1.1.1"
+
+        self.assertEqual(get_client_ip_address(request), ("8.8.8.8", True))
+
+
+class TwoPerMinuteThrottle(throttling.AnonRateThrottle):
+    rate = "2/minute"
+
+
+class RedisRateThrottleTests(SimpleTestCase):
+    def setUp(self):
+        self.request = RequestFactory().get("/")
+        self.request.user = AnonymousUser()
+
+    def patch_script(self, **kwargs):
+        script = mock.Mock(**kwargs)
+        patcher = mock.patch.object(
+            throttling, "_get_rate_limit_script", return_value=script
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return script
+
+    def test_allows_requests_within_the_limit(self):
+        self.patch_script(return_value=[2, 45])
+        throttle = TwoPerMinuteThrottle()
+
+        self.assertTrue(throttle.allow_request(self.request, None))
+
+    def test_rejects_requests_over_the_limit_with_window_wait(self):
+        self.patch_script(return_value=[3, 45])
+        throttle = TwoPerMinuteThrottle()
+
+        self.assertFalse(throttle.allow_request(self.request, None))
+        self.assertEqual(throttle.wait(), 45)
+
+    def test_wait_defaults_to_duration_without_ttl(self):
+        self.patch_script(return_value=[3, -1])
+        throttle = TwoPerMinuteThrottle()
+
+        throttle.allow_request(self.request, None)
+
+        self.assertEqual(throttle.wait(), 60)
+
+    def test_counts_under_the_cache_key_for_the_window(self):
+        script = self.patch_script(return_value=[1, 60])
+        throttle = TwoPerMinuteThrottle()
+
+        throttle.allow_request(self.request, None)
+
+        script.assert_called_once_with(
+            keys=[throttling.cache.make_key(throttle.key)], args=[60]
+        )
+
+    def test_fails_open_when_redis_errors(self):
+        self.patch_script(side_effect=RedisError("down"))
+        throttle = TwoPerMinuteThrottle()
+
+        with self.assertLogs("utils.throttling", "WARNING"):
+            self.assertTrue(throttle.allow_request(self.request, None))
+
+
+class BlockedIPRedisFallbackTests(SimpleTestCase):
+    def setUp(self):
+        blocked_ip._lookup_blocked_ip.cache_clear()
+        self.addCleanup(blocked_ip._lookup_blocked_ip.cache_clear)
+        patcher = mock.patch.object(blocked_ip, "_attempts_script", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def patch(self, name, **kwargs):
+        patcher = mock.patch.object(blocked_ip, name, **kwargs)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_counts_attempts_with_the_script(self):
+        connection = self.patch("get_redis_connection").return_value
+        connection.register_script.return_value.return_value = 3
+
+        self.assertEqual(blocked_ip.increment_attempts_in_redis("8.8.8.8"), 3)
+
+    def test_attempts_fail_open_when_redis_errors(self):
+        connection = self.patch("get_redis_connection").return_value
+        connection.register_script.return_value.side_effect = RedisError("down")
+
+        with self.assertLogs("utils.blocked_ip", "WARNING"):
+            self.assertEqual(blocked_ip.increment_attempts_in_redis("8.8.8.8"), 0)
+
+    def test_lookup_falls_back_to_database_when_redis_errors(self):
+        self.patch("get_redis_connection", side_effect=RedisError("down"))
+        self.patch("cache")
+        model = self.patch("BlockedIP")
+        model.objects.filter.return_value.exists.return_value = True
+
+        with self.assertLogs("utils.blocked_ip", "WARNING"):
+            self.assertTrue(blocked_ip._lookup_blocked_ip("8.8.8.8", 0))
+        model.objects.filter.assert_called_once_with(
+            blocked_ip="8.8.8.8", is_blocked=True
+        )
+
+
+class UUID7Tests(SimpleTestCase):
+    def setUp(self):
+        # Start each test with a fresh clock so fixed timestamps aren't
+        # treated as the clock stepping back.
+        patcher = mock.patch("utils.uuid7._last_ms", 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_version_and_variant_bits(self):
+        value = uuid7()
+
+        self.assertEqual(value.version, 7)
+        self.assertEqual(value.variant, uuid.RFC_4122)
+
+    def test_embeds_the_millisecond_timestamp(self):
+        with mock.patch(
+            "utils.uuid7.time.time_ns", return_value=1_700_000_000_123_456_789
+        ):
+            value = uuid7()
+
+        self.assertEqual(value.int >> 80, 1_700_000_000_123)
+
+    def test_ordered_within_one_millisecond(self):
+        with mock.patch(
+            "utils.uuid7.time.time_ns", return_value=1_700_000_000_000_000_000
+        ):
+            values = [uuid7() for _ in range(5000)]
+
+        self.assertEqual(values, sorted(values))
+        self.assertEqual(len(set(values)), len(values))
+        for value in values:
+            self.assertEqual(value.version, 7)
+            self.assertEqual(value.variant, uuid.RFC_4122)
+
+    def test_ordered_when_the_clock_steps_back(self):
+        with mock.patch("utils.uuid7.time.time_ns") as time_ns:
+            time_ns.return_value = 1_800_000_000_000_000_000
+            first = uuid7()
+            time_ns.return_value = 1_799_999_999_000_000_000
+            second = uuid7()
+
+        self.assertLess(first, second)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-15 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('two_factor', '0003_alter_trusteddevice_ip_address'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='trusteddevice',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Created at'),
+        ),
+    ]
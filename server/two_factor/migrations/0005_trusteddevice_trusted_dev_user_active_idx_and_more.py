@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-15 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('two_factor', '0004_alter_trusteddevice_created_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trusteddevice',
+            index=models.Index(fields=['user', 'is_active', '-last_login'], name='trusted_dev_user_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trusteddevice',
+            index=models.Index(fields=['expires_at'], name='trusted_dev_expires_at_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+import hashlib
+
+from django.db import migrations
+
+
+def hash_device_ids(apps, schema_editor):
+    # Existing rows hold raw device IDs; store their SHA-256 instead so the
+    # cookies already issued keep matching.
+    TrustedDevice = apps.get_model('two_factor', 'TrustedDevice')
+    for device in TrustedDevice.objects.only('id', 'device_id').iterator():
+        device.device_id = hashlib.sha256(device.device_id.encode()).hexdigest()
+        device.save(update_fields=['device_id'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('two_factor', '0005_trusteddevice_trusted_dev_user_active_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(hash_device_ids, migrations.RunPython.noop),
+    ]
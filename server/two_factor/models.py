@@ -1,18 +1,32 @@
+import functools
+import hashlib
+import hmac
 import os
 import random
 import secrets
-import string
 import uuid
 
-from cryptography.fernet import Fernet
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, F, Value, When
 from django.utils import timezone
 from django_otp.models import Device
 
 from utils.models_mixin import BaseModel
 
 
+@functools.lru_cache(maxsize=1)
+def _get_otp_key():
+    """
+    Derives the OTP hashing key once per process. BLAKE2b keys are limited to
+    64 bytes, so the secret is reduced to a 32-byte digest first.
+    """
+    secret_key = os.getenv("DJANGO_SECRET_KEY")
+    if not secret_key:
+        raise ValueError("SECRET_KEY environment variable not set.")
+    return hashlib.sha256(secret_key.encode()).digest()
+
+
 class AdvancedOTPDevice(Device):
     """
     An advanced OTP device with features like encryption, rate limiting,
@@ -21,7 +35,7 @@ class AdvancedOTPDevice(Device):
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
-    # Encrypted OTP
+    # Keyed BLAKE2b hash of the OTP; the code itself is never stored
     otp_encrypted = models.CharField(max_length=256, blank=True, null=True)
 
     # Timestamps
@@ -41,14 +55,29 @@ class AdvancedOTPDevice(Device):
     # Lockout until a certain time if we exceed failed attempts
     lock_until = models.DateTimeField(blank=True, null=True)
 
-    def _get_cipher(self):
+    @classmethod
+    def get_email_device(cls, user):
+        """
+        Return the user's email OTP device, creating it on first use.
+
+        Almost every user already has one, so try a plain SELECT first and only
+        fall back to `get_or_create` (and its savepoint) when it is missing.
         """
-        Returns a Fernet cipher instance using the SECRET_KEY from environment variables.
+        try:
+            return cls.objects.get(user=user, name="email_otp_device")
+        except cls.DoesNotExist:
+            device, _ = cls.objects.get_or_create(user=user, name="email_otp_device")
+            return device
+
+    def _hash_code(self, code):
         """
-        secret_key = os.getenv("DJANGO_SECRET_KEY")
-        if not secret_key:
-            raise ValueError("SECRET_KEY environment variable not set.")
-        return Fernet(secret_key.encode())
+        Returns the keyed hash of an OTP, using the SECRET_KEY from environment variables.
+        The code only ever has to be compared, never recovered, so a MAC is
+        enough and much cheaper than encrypting it.
+        """
+        return hashlib.blake2b(
+            code.encode(), key=_get_otp_key(), digest_size=16
+        ).hexdigest()
 
     def generate_token(
         self,
@@ -106,12 +135,12 @@ class AdvancedOTPDevice(Device):
             }  # HTTP 423 LOCKED
 
         # 4️⃣ **Generate OTP**
-        code = "".join(secrets.choice(string.digits) for _ in range(code_length))
-        cipher = self._get_cipher()
-        encrypted_otp = cipher.encrypt(code.encode()).decode()
+        # One CSPRNG draw, zero-padded to the full length.
+        code = f"{secrets.randbelow(10**code_length):0{code_length}d}"
+        hashed_otp = self._hash_code(code)
 
         # 5️⃣ **Set OTP metadata**
-        self.otp_encrypted = encrypted_otp
+        self.otp_encrypted = hashed_otp
         self.otp_created_at = now
         self.otp_expiry = now + timezone.timedelta(seconds=valid_for_seconds)
         self.used = False
@@ -144,7 +173,11 @@ class AdvancedOTPDevice(Device):
             ]
         )
 
-        self.save(update_fields=list(set(fields_to_update)))
+        # Write just these columns with a single UPDATE, skipping save() and
+        # its signals; the dict also drops the duplicate "failed_attempts".
+        type(self).objects.filter(pk=self.pk).update(
+            **{field: getattr(self, field) for field in fields_to_update}
+        )
 
         return {
             "error": False,
@@ -189,34 +222,47 @@ class AdvancedOTPDevice(Device):
 
         # 5️⃣ **Verify OTP**
         try:
-            cipher = self._get_cipher()
-            decrypted_otp = cipher.decrypt(self.otp_encrypted.encode()).decode()
+            hashed_token = self._hash_code(str(token))
         except Exception:
             return {
                 "error": True,
                 "message": "An error occurred. Please try again.",
             }
 
-        if decrypted_otp != token:
-            self.failed_attempts += 1
-            fields_to_update = ["failed_attempts"]
+        # Constant-time comparison, so response timing doesn't leak how much
+        # of the guess was right.
+        if not hmac.compare_digest(hashed_token, self.otp_encrypted):
+            min_lock_time = 5 * 60  # 5 minutes
+            max_lock_time = 10 * 60  # 10 minutes
+            random_lock_time = random.randint(min_lock_time, max_lock_time)
+
+            # Increment the counter in the database, and lock the device in the
+            # same UPDATE once it reaches the maximum, so concurrent failures
+            # can't overwrite each other's count. The lock condition reads the
+            # stored, pre-increment count and checks whether this failure
+            # (`failed_attempts + 1`) reaches `max_failed_attempts`.
+            devices = type(self).objects.filter(pk=self.pk)
+            devices.update(
+                lock_until=Case(
+                    When(
+                        failed_attempts__gte=F("max_failed_attempts") - 1,
+                        then=Value(now + timezone.timedelta(seconds=random_lock_time)),
+                    ),
+                    default=F("lock_until"),
+                ),
+                failed_attempts=F("failed_attempts") + 1,
+            )
+            self.failed_attempts, self.lock_until = devices.values_list(
+                "failed_attempts", "lock_until"
+            ).get()
 
             # Lock the device if failed attempts exceed the maximum
             if self.failed_attempts >= self.max_failed_attempts:
-                min_lock_time = 5 * 60  # 5 minutes
-                max_lock_time = 10 * 60  # 10 minutes
-                random_lock_time = random.randint(min_lock_time, max_lock_time)
-                self.lock_until = now + timezone.timedelta(seconds=random_lock_time)
-                fields_to_update.append("lock_until")
-
-                self.save(update_fields=fields_to_update)
-
                 lock_minutes = random_lock_time // 60
                 lock_seconds = random_lock_time % 60
                 lock_message = f"Too many failed attempts. Please try again in {lock_minutes} minutes and {lock_seconds} seconds."
                 return {"error": True, "message": lock_message}
 
-            self.save(update_fields=fields_to_update)
             return {
                 "error": True,
                 "message": "Invalid OTP. Please try again.",
@@ -246,7 +292,8 @@ class TrustedDevice(BaseModel):
         on_delete=models.CASCADE,
         related_name="trusted_devices",
     )
-    # A long, random, unguessable string stored in a secure cookie.
+    # SHA-256 of the long, random, unguessable string stored in a secure cookie
+    # (see `hash_device_id`), so a database leak doesn't expose live tokens.
     device_id = models.CharField(max_length=255, unique=True, db_index=True)
 
     # Parsed User-Agent information for user-friendly display.
@@ -266,13 +313,17 @@ class TrustedDevice(BaseModel):
     # Timestamps for session management and display.
     last_login = models.DateTimeField(auto_now=True)
 
+    # Default limit on concurrent trusted devices per user.
+    MAX_SESSIONS_DEFAULT = 5
+
     # Security controls
     expires_at = models.DateTimeField(
         default=None, help_text="When this trusted device will expire"
     )
     is_active = models.BooleanField(default=True)
     max_sessions = models.PositiveIntegerField(
-        default=5, help_text="Maximum number of concurrent trusted devices allowed"
+        default=MAX_SESSIONS_DEFAULT,
+        help_text="Maximum number of concurrent trusted devices allowed",
     )
 
     class Meta:
@@ -280,44 +331,74 @@ class TrustedDevice(BaseModel):
         ordering = ["-last_login"]
         # A user can't have duplicate device IDs, and a device ID must be unique per user.
         unique_together = ("user", "device_id")
+        indexes = [
+            # Active devices per user, newest first (session limits).
+            models.Index(
+                fields=["user", "is_active", "-last_login"],
+                name="trusted_dev_user_active_idx",
+            ),
+            # Expired-device cleanup.
+            models.Index(fields=["expires_at"], name="trusted_dev_expires_at_idx"),
+        ]
         verbose_name = "Trusted Device"
         verbose_name_plural = "Trusted Devices"
 
     def __str__(self):
         return f"{self.user.email} on {self.browser} ({self.os})"
 
+    @staticmethod
+    def hash_device_id(device_id):
+        """Returns the value stored in `device_id` for a client's raw device ID."""
+        return hashlib.sha256(device_id.encode()).hexdigest()
+
     @property
     def is_expired(self):
-        """Check if the trusted device has expired."""
+        """
+        Check if the trusted device has expired.
+
+        Lookups should filter on `expires_at__gt=timezone.now()` instead of
+        loading a device to check this; expired rows are swept periodically by
+        `two_factor.tasks.cleanup_expired_trusted_devices`.
+        """
         return timezone.now() > self.expires_at
 
     @classmethod
-    def cleanup_expired_devices(cls):
-        """Remove expired trusted devices."""
-        expired_devices = cls.objects.filter(expires_at__lt=timezone.now())
-        count = expired_devices.count()
-        expired_devices.delete()
-        return count
+    def cleanup_expired_devices(cls, batch_size=1000):
+        """
+        Remove expired trusted devices.
+
+        Deletes in batches of `batch_size`, each in its own transaction, so a
+        large backlog never holds row locks that block live logins for long.
+        """
+        now = timezone.now()
+        count = 0
+        while True:
+            with transaction.atomic():
+                # Ordered by expires_at (not Meta.ordering) so each batch is a
+                # range scan of the expires_at index.
+                expired_ids = list(
+                    cls.objects.filter(expires_at__lt=now)
+                    .order_by("expires_at")
+                    .values_list("id", flat=True)[:batch_size]
+                )
+                if not expired_ids:
+                    return count
+                deleted, _ = cls.objects.filter(id__in=expired_ids).delete()
+            count += deleted
 
     @classmethod
     def enforce_session_limits(cls, user):
         """Enforce maximum concurrent trusted devices per user."""
-        active_devices = cls.objects.filter(user=user, is_active=True)
-
-        if active_devices.count() > cls._meta.get_field("max_sessions").default:
-            # Remove oldest devices beyond the limit
-            excess_count = (
-                active_devices.count() - cls._meta.get_field("max_sessions").default
-            )
-            # Identify the primary keys of the oldest devices to remove.
-            devices_to_remove_ids = list(
-                active_devices.order_by("last_login").values_list("id", flat=True)[
-                    :excess_count
-                ]
-            )
-            # Perform the delete on a new queryset filtered by those IDs.
-            if devices_to_remove_ids:
-                cls.objects.filter(id__in=devices_to_remove_ids).delete()
+        max_sessions = cls.MAX_SESSIONS_DEFAULT
+        # Everything past the newest `max_sessions` devices, deleted with a
+        # single DELETE ... WHERE id IN (SELECT ... OFFSET n) instead of
+        # counting first and fetching the IDs.
+        excess_devices = (
+            cls.objects.filter(user=user, is_active=True)
+            .order_by("-last_login")
+            .values("id")[max_sessions:]
+        )
+        cls.objects.filter(id__in=excess_devices).delete()
 
     def deactivate(self):
         """Deactivate this trusted device."""
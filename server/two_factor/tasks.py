@@ -0,0 +1,12 @@
+from app.celery import app
+
+from .models import TrustedDevice
+
+
+@app.task
+def cleanup_expired_trusted_devices():
+    """
+    Periodically removes expired trusted devices, so the login path only has
+    to filter them out instead of deleting them inline.
+    """
+    return TrustedDevice.cleanup_expired_devices()
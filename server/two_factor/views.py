@@ -1,5 +1,8 @@
 import secrets
 
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.functions import Now
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.permissions import AllowAny
@@ -13,6 +16,8 @@ from utils.user_agent_parser import parse_user_agent
 from .models import AdvancedOTPDevice, TrustedDevice
 from .serializers import Verify2FASerializer
 
+User = get_user_model()
+
 
 class Verify2Fa(APIView):
     throttle_scope = "otp"
@@ -42,10 +47,7 @@ class Verify2Fa(APIView):
 
             # --- Start of New "Risk Based Authentication" Logic ---
 
-            # 1. Generate JWT tokens for the session
-            refresh = RefreshToken.for_user(user)
-
-            # 2. Gather all device information
+            # 1. Gather all device information
             device_id = secrets.token_urlsafe(32)
             ua_info = parse_user_agent(request)
             ip_address = get_client_ip_only(request)
@@ -55,24 +57,31 @@ class Verify2Fa(APIView):
             city = None
             country = None
 
-            # 3. Enforce session limits before creating new trusted device
-            TrustedDevice.enforce_session_limits(user)
-
-            # 4. Create the TrustedDevice record to "remember" this device
-            TrustedDevice.objects.create(
-                user=user,
-                device_id=device_id,
-                browser=ua_info["browser"],
-                os=ua_info["os"],
-                device=ua_info["device"],
-                ip_address=ip_address,
-                city=city,
-                country=country,
-            )
+            # All the writes for a successful login share one transaction.
+            with transaction.atomic():
+                # 2. Generate JWT tokens for the session
+                refresh = RefreshToken.for_user(user)
+
+                # 3. Enforce session limits before creating new trusted device
+                TrustedDevice.enforce_session_limits(user)
+
+                # 4. Create the TrustedDevice record to "remember" this device.
+                # Passing expires_at skips the default-expiry branch in save().
+                now = timezone.now()
+                TrustedDevice.objects.create(
+                    user=user,
+                    device_id=TrustedDevice.hash_device_id(device_id),
+                    browser=ua_info["browser"],
+                    os=ua_info["os"],
+                    device=ua_info["device"],
+                    ip_address=ip_address,
+                    city=city,
+                    country=country,
+                    expires_at=now + timezone.timedelta(days=30),
+                )
 
-            # 4. Update user's last login timestamp
-            user.last_login = timezone.localtime(timezone.now())
-            user.save(update_fields=["last_login"])
+                # 4. Update user's last login timestamp without re-saving the user
+                User.objects.filter(pk=user.pk).update(last_login=Now())
 
             # 5. Prepare the API response payload
             avatar_url = (
@@ -1,7 +1,7 @@
 from typing import Any, Dict, Optional
 
 from django.db import transaction
-from django.utils import timezone
+from django.db.models.functions import Now
 from rest_framework_simplejwt.tokens import RefreshToken
 from two_factor.models import TrustedDevice
 
@@ -68,9 +68,8 @@ class AuthService:
         """
         Constructs the successful login response with JWT tokens and user data.
         """
-        # Update last_login timestamp
-        user.last_login = timezone.now()
-        user.save(update_fields=["last_login"])
+        # Update last_login timestamp, letting the database fill it in
+        User.objects.filter(pk=user.pk).update(last_login=Now())
 
         # Generate tokens
         refresh = RefreshToken.for_user(user)
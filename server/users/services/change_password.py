@@ -27,7 +27,9 @@ class ChangePasswordService:
         # Update password on the user object
         user.set_password(new_password)
         user.has_changed_password = True
-        user.save()
+        # Only write the changed columns; updated_at is listed so auto_now
+        # still bumps it.
+        user.save(update_fields=["password", "has_changed_password", "updated_at"])
 
         #  TODO: Notify Via Email, password Changed
 
@@ -1,9 +1,29 @@
+import hashlib
+import hmac
 from typing import Optional
 
+from django.conf import settings
+from django.core.cache import cache
+
 from ..models import User
 
 from .user_lookup_service import find_user_by_email
 
+# Successful password checks are remembered this long, so double submits and
+# OTP retry storms don't re-run the (deliberately slow) password hasher.
+CREDENTIAL_CACHE_SECONDS = 2
+
+
+def _credential_cache_key(user: User, password: str) -> str:
+    # Keyed on the stored hash too, so changing the password invalidates it.
+    # Only an HMAC of the password ever reaches Redis.
+    digest = hmac.new(
+        settings.SECRET_KEY.encode(),
+        f"{user.pk}:{user.password}:{password}".encode(),
+        hashlib.sha256,
+    ).hexdigest()
+    return f"login_ok:{digest}"
+
 
 class CredentialService:
     """
@@ -23,8 +43,18 @@ class CredentialService:
             The authenticated User object, or None if authentication fails.
         """
         user = find_user_by_email(email)
-
-        if user and user.check_password(password) and user.is_active:
+        if not user:
+            return None
+
+        cache_key = _credential_cache_key(user, password)
+        if cache.get(cache_key):
+            password_ok = True
+        else:
+            password_ok = user.check_password(password)
+            if password_ok:
+                cache.set(cache_key, True, timeout=CREDENTIAL_CACHE_SECONDS)
+
+        if password_ok and user.is_active:
             return user
 
         return None
@@ -1,19 +1,22 @@
-from django.utils import timezone
+import logging
+
+from django.db.models.functions import Now
 from rest_framework_simplejwt.tokens import RefreshToken
 from two_factor.models import AdvancedOTPDevice
+from utils.send_email_helper import send_otp
 
 from ..models import User
 from .trusted_device_service import DeviceService
 from .user_lookup_service import find_user_by_email
 
+logger = logging.getLogger(__name__)
+
 
 class OTPService:
     @staticmethod
     def generate_otp_code(user):
         """Generate OTP code for user authentication."""
-        device, _ = AdvancedOTPDevice.objects.get_or_create(
-            user=user, name="email_otp_device"
-        )
+        device = AdvancedOTPDevice.get_email_device(user)
         result = device.generate_token()
 
         if result.get("error"):
@@ -21,8 +24,8 @@ class OTPService:
 
         otp_code = result.get("otp_code")
         if otp_code:
-            # TODO: Send OTP via email or SMS
-            print(otp_code)
+            logger.debug("OTP generated for user %s", user.pk)
+            send_otp.delay(user.email, otp_code)
             return {"error": False, "otp_code": otp_code}
 
         return {"error": True, "message": "Failed to generate OTP"}
@@ -48,17 +51,16 @@ class OTPService:
         refresh = RefreshToken.for_user(user)
 
         # Create trusted device if device info is provided
-        trusted_device = None
+        device_id = None
         signature = None
 
         if device_info:
-            trusted_device, signature = DeviceService.trust_device(
+            device_id, signature = DeviceService.trust_device(
                 user=user, device_info=device_info, days=device_info.get("days", 7)
             )
 
-        # Update last login
-        user.last_login = timezone.now()
-        user.save(update_fields=["last_login"])
+        # Update last login, letting the database fill it in
+        User.objects.filter(pk=user.pk).update(last_login=Now())
 
         response_data = {
             "error": False,
@@ -73,8 +75,8 @@ class OTPService:
         }
 
         # Add device info if trusted device was created
-        if trusted_device and signature:
-            response_data["device_id"] = trusted_device.device_id
+        if device_id and signature:
+            response_data["device_id"] = device_id
             response_data["device_signature"] = signature
         else:
             response_data["device_id"] = None
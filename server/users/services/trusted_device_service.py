@@ -52,19 +52,23 @@ class DeviceService:
     def is_new_device(user, device_id: str) -> bool:
         """
         Check if a given device_id corresponds to a currently active trusted device for the user.
+
+        A trusted device has its `last_login` refreshed by the same UPDATE that
+        looks it up, so the check costs one query and never loads the row.
         """
         if not device_id:
             return True  # No device ID always means it's a new device.
 
-        # Check for a device that is active and has not expired.
-        trusted_device = TrustedDevice.objects.filter(
+        # Touch a device that is active and has not expired.
+        now = timezone.now()
+        updated = TrustedDevice.objects.filter(
             user=user,
-            device_id=device_id,
+            device_id=TrustedDevice.hash_device_id(device_id),
             is_active=True,
-            expires_at__gt=timezone.now(),
-        ).first()
+            expires_at__gt=now,
+        ).update(last_login=now)
 
-        return trusted_device is None
+        return updated == 0
 
     @staticmethod
     def trust_device(user, device_info=None, days=30):
@@ -73,6 +77,9 @@ class DeviceService:
 
         This method now captures and stores the full set of device, location,
         and network information provided by the client application.
+
+        Returns the raw device ID and its signature for the client to store;
+        the database only keeps the ID's hash.
         """
         device_info = device_info or {}
 
@@ -96,9 +103,10 @@ class DeviceService:
 
         # Create the new trusted device record.
         # We use create() directly as a new device ID is always generated.
-        trusted_device = TrustedDevice.objects.create(
+        # Only its hash is stored; the raw ID goes back to the client.
+        TrustedDevice.objects.create(
             user=user,
-            device_id=device_id,
+            device_id=TrustedDevice.hash_device_id(device_id),
             platform=platform,
             os=os_info,
             device=device,
@@ -113,6 +121,6 @@ class DeviceService:
         )
 
         # Generate a new signature for the client to store.
-        signature = DeviceService.sign_device_id(trusted_device.device_id)
+        signature = DeviceService.sign_device_id(device_id)
 
-        return trusted_device, signature
+        return device_id, signature
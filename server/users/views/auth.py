@@ -17,7 +17,6 @@ class LoginView(APIView):
         email = request.data.get("email")
         password = request.data.get("password")
         device_info = request.data.get("device_info", {})
-        print(device_info)
 
         # Validate required fields
         if not email or not password:
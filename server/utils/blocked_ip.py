@@ -1,33 +1,379 @@
+import functools
+import ipaddress
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any
+
 from django.core.cache import cache
-from django.http import JsonResponse
+from django.db import connections
+from django.http import HttpRequest, JsonResponse
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
 from rest_framework import status
 
 from misc.models import BlockedIP
+from utils.bloom_filter import BloomFilter
 from utils.ip_detection import get_client_ip_only
+from utils.ip_prefix_table import IPPrefixTable
+
+logger = logging.getLogger(__name__)
 
 MAX_ATTEMPTS = 5
 REDIS_EXPIRE_SECONDS = 60 * 15  # 15 minutes
 
+# Denial payloads are static, so they are serialized once at import time.
+ACCESS_DENIED_BODY = json.dumps(
+    {"error": True, "message": "Access denied. Please contact support."}
+).encode()
+BAD_REQUEST_BODY = json.dumps(
+    {"error": True, "message": "Unable to process your request."}
+).encode()
+
+# Redis pub/sub channel used to tell every process about blocklist changes.
+BLOCKLIST_CHANNEL = "blocked_ip:changed"
+# Sized for ~100k blocked IPs at a 0.1% false-positive rate (~180KB).
+BLOOM_CAPACITY = 100_000
+BLOOM_ERROR_RATE = 0.001
+# Blocked IPv4 addresses are kept in Redis as one bitmap per /24:
+# `a.b.c.d` is bit `d` of `bl:{a.b.c}` (32 bytes per populated /24).
+BLOCKLIST_BITMAP_KEY = "bl:{{{}.{}.{}}}"
+
+# Counts a failed attempt, starting the expiry window on the first one, as a
+# single atomic step. Returns the new count.
+_ATTEMPTS_SCRIPT = """
+local attempts = redis.call('INCR', KEYS[1])
+if attempts == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return attempts
+"""
+
+# Per-process cache of Redis/DB answers for IPs that pass the bloom filter.
+# Sized well above the number of distinct attacker IPs seen in a burst.
+L1_CACHE_SIZE = 4096
+L1_CACHE_TTL_SECONDS = 60
+
+_local_blocklist: "LocalBlocklist | None" = None
+_local_blocklist_generation = 0
+_local_blocklist_lock = threading.Lock()
+_listener_started = False
+_listener_lock = threading.Lock()
+# Set in forked children: the inherited blocklist may miss changes published
+# before the child subscribed, so it is refreshed once the listener is up.
+_resync_on_subscribe = False
+_attempts_script: Any = None
+
+
+class LocalBlocklist:
+    """
+    Per-process view of the blocklist.
+
+    `BlockedIP.blocked_ip` holds either a single IP or a CIDR range. Single
+    IPs (the bulk of the table, created by `permanently_block_ip`) go into a
+    compact bloom filter whose hits still need confirming; ranges are few and
+    go into an exact prefix table, so a range match is final.
+    """
+
+    def __init__(self) -> None:
+        self.bloom = BloomFilter(BLOOM_CAPACITY, BLOOM_ERROR_RATE)
+        self.ranges = IPPrefixTable()
+
+    def add(self, blocked_ip: str) -> None:
+        if "/" in blocked_ip:
+            self.ranges.insert(blocked_ip)
+        else:
+            self.bloom.add(blocked_ip)
+
+    def remove(self, blocked_ip: str) -> None:
+        # Bloom filters can't forget entries; a stale bit only costs one
+        # Redis lookup, so only ranges need removing.
+        if "/" in blocked_ip:
+            self.ranges.delete(blocked_ip)
+
+    def lookup(self, ip_address: str) -> bool | None:
+        """
+        Returns True if the IP is inside a blocked range, False if it is
+        definitely not blocked, and None if it has to be confirmed.
+        """
+        if self.ranges:
+            try:
+                if ip_address in self.ranges:
+                    return True
+            except ValueError:
+                pass
+        if ip_address in self.bloom:
+            return None
+        return False
+
+
+def _build_local_blocklist() -> LocalBlocklist:
+    blocklist = LocalBlocklist()
+    blocked_ips = BlockedIP.objects.filter(is_blocked=True).values_list(
+        "blocked_ip", flat=True
+    )
+    for blocked_ip in blocked_ips.iterator():
+        try:
+            blocklist.add(blocked_ip)
+        except ValueError:
+            logger.warning("Ignoring malformed blocked IP range %r.", blocked_ip)
+    return blocklist
+
+
+def get_local_blocklist() -> LocalBlocklist:
+    """
+    Returns this process' in-memory blocklist, building it on first use.
+    """
+    blocklist = _ensure_local_blocklist()
+    if not _listener_started:
+        _start_blocklist_listener()
+    return blocklist
+
+
+def _ensure_local_blocklist() -> LocalBlocklist:
+    global _local_blocklist
+    blocklist = _local_blocklist
+    if blocklist is None:
+        with _local_blocklist_lock:
+            blocklist = _local_blocklist
+            if blocklist is None:
+                generation = _local_blocklist_generation
+                blocklist = _build_local_blocklist()
+                # Only keep it if nothing replaced it while building.
+                if generation == _local_blocklist_generation:
+                    _local_blocklist = blocklist
+    return blocklist
+
+
+def preload_local_blocklist() -> None:
+    """
+    Builds the in-memory blocklist up front, at server start-up.
+
+    Called from the WSGI/ASGI entry points so the first requests don't pay for
+    it. When the server preloads the application before forking workers
+    (e.g. `gunicorn --preload`), the blocklist is built once and shared with
+    every worker copy-on-write. Failures are logged and left to the lazy path.
+
+    The change listener isn't started here, and the database connection used
+    for the build is closed afterwards: neither may be inherited by forked
+    workers. Each process starts its own listener on first use.
+    """
+    try:
+        _ensure_local_blocklist()
+    except Exception:
+        logger.warning("Could not preload the IP blocklist.", exc_info=True)
+    finally:
+        connections.close_all()
+
+
+def _reset_after_fork() -> None:
+    # Threads don't survive fork(): a worker inheriting a preloaded blocklist
+    # has to start its own change listener, and resync once it is subscribed.
+    global _local_blocklist_lock, _listener_lock, _listener_started
+    global _resync_on_subscribe
+    _local_blocklist_lock = threading.Lock()
+    _listener_lock = threading.Lock()
+    _listener_started = False
+    _resync_on_subscribe = True
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def apply_blocklist_change(action: str, blocked_ip: str) -> None:
+    """
+    Applies a "block"/"unblock" change to this process' in-memory blocklist,
+    if it has been built.
+    """
+    _lookup_blocked_ip.cache_clear()
+    blocklist = _local_blocklist
+    if blocklist is None:
+        return
+    try:
+        if action == "block":
+            blocklist.add(blocked_ip)
+        elif action == "unblock":
+            blocklist.remove(blocked_ip)
+    except ValueError:
+        logger.warning("Ignoring malformed blocked IP range %r.", blocked_ip)
+
+
+def lookup_local_blocklist(ip_address: str) -> bool | None:
+    """
+    Same as `LocalBlocklist.lookup`, but never does any I/O: returns None
+    when the blocklist hasn't been built yet. Safe to call from async code.
+    """
+    blocklist = _local_blocklist
+    if blocklist is None:
+        return None
+    if not _listener_started:
+        _start_blocklist_listener()
+    return blocklist.lookup(ip_address)
+
+
+def refresh_local_blocklist() -> None:
+    """
+    Rebuilds the in-memory blocklist from the database and swaps it in.
+
+    The current blocklist keeps answering requests while the new one is
+    built, so request threads never see an unbuilt blocklist. Does nothing if
+    the blocklist hasn't been built yet: the lazy build reads fresh data anyway.
+    """
+    global _local_blocklist, _local_blocklist_generation
+    if _local_blocklist is None:
+        return
+    try:
+        blocklist = _build_local_blocklist()
+    finally:
+        # This runs outside the request cycle, so don't keep the connection.
+        connections.close_all()
+    with _local_blocklist_lock:
+        _local_blocklist_generation += 1
+        _local_blocklist = blocklist
+    _lookup_blocked_ip.cache_clear()
+
+
+def publish_blocklist_change(action: str, blocked_ip: str) -> None:
+    """
+    Notifies the other processes of a "block"/"unblock" change so they can
+    update their in-memory blocklists.
+    """
+    try:
+        get_redis_connection("default").publish(
+            BLOCKLIST_CHANNEL, f"{action}:{blocked_ip}"
+        )
+    except Exception:
+        logger.warning("Failed to publish blocked IP change.", exc_info=True)
+
+
+def _listen_for_blocklist_changes() -> None:
+    global _resync_on_subscribe
+    reconnecting = False
+    while True:
+        try:
+            pubsub = get_redis_connection("default").pubsub(
+                ignore_subscribe_messages=True
+            )
+            pubsub.subscribe(BLOCKLIST_CHANNEL)
+            if reconnecting or _resync_on_subscribe:
+                # Changes may have been missed while disconnected (or since
+                # the blocklist was built before fork), so resync. Changes
+                # published meanwhile wait in the subscription and are
+                # applied to the new blocklist afterwards.
+                refresh_local_blocklist()
+                reconnecting = False
+                _resync_on_subscribe = False
+            while True:
+                message = pubsub.get_message(timeout=1.0)
+                if message is not None:
+                    action, _, blocked_ip = message["data"].decode().partition(":")
+                    apply_blocklist_change(action, blocked_ip)
+        except Exception:
+            logger.warning("Blocked IP listener disconnected, retrying.", exc_info=True)
+            reconnecting = True
+            time.sleep(5)
+
+
+def _start_blocklist_listener() -> None:
+    global _listener_started
+    with _listener_lock:
+        if _listener_started:
+            return
+        _listener_started = True
+    threading.Thread(
+        target=_listen_for_blocklist_changes, name="blocked-ip-listener", daemon=True
+    ).start()
+
 
 def is_ip_in_db_blocklist(ip_address: str) -> bool:
     """
     Checks the SQL database to see if this IP is permanently blocked.
-    Uses Redis cache to avoid frequent database queries.
+    The in-process blocklist answers blocked ranges and the common "not
+    blocked" case without any network I/O; Redis cache is used to avoid
+    frequent database queries.
+    """
+    verdict = get_local_blocklist().lookup(ip_address)
+    if verdict is not None:
+        return verdict
+
+    # Repeat offenders are answered from the per-process L1 cache; the time
+    # bucket argument expires its entries after L1_CACHE_TTL_SECONDS.
+    return _lookup_blocked_ip(ip_address, int(time.monotonic() // L1_CACHE_TTL_SECONDS))
+
+
+def _bitmap_slot(
+    address: ipaddress.IPv4Address | ipaddress.IPv6Address,
+) -> tuple[str, int] | None:
+    """
+    Returns the Redis bitmap (key, offset) holding an IPv4 address' blocked
+    bit, or None for IPv6 addresses.
+    """
+    if address.version != 4:
+        return None
+    a, b, c, d = address.packed
+    return cache.make_key(BLOCKLIST_BITMAP_KEY.format(a, b, c)), d
+
+
+def cache_block_status(ip_address: str, is_blocked: bool) -> None:
+    """
+    Records a single IP's block status in Redis. IPv4 addresses flip their
+    bit in the /24 bitmap; IPv6 addresses keep a per-IP key for 5 minutes.
     """
     cache_key = f"blocked_ip:{ip_address}"
+    slot = _bitmap_slot(ipaddress.ip_address(ip_address))
+    if slot is not None:
+        # The raw client doesn't honour IGNORE_EXCEPTIONS, so fail soft here
+        # like the cache calls do; the database stays authoritative.
+        try:
+            get_redis_connection("default").setbit(*slot, int(is_blocked))
+        except RedisError:
+            logger.warning("Failed to update blocked IP bitmap.", exc_info=True)
 
-    # Check Redis cache first
-    cached_result = cache.get(cache_key)
-    if cached_result is not None:
-        return bool(cached_result)
+    if is_blocked and slot is None:
+        cache.set(cache_key, True, timeout=300)
+    else:
+        # Drop any stale verdict so unblocking takes effect immediately.
+        cache.delete(cache_key)
+
+
+@functools.lru_cache(maxsize=L1_CACHE_SIZE)
+def _lookup_blocked_ip(ip_address: str, ttl_bucket: int) -> bool:
+    # The column is a native inet on PostgreSQL, which rejects malformed input.
+    try:
+        address = ipaddress.ip_address(ip_address)
+    except ValueError:
+        return False
+
+    # Check the IPv4 bitmap and the per-IP Redis cache in one round trip
+    cache_key = f"blocked_ip:{ip_address}"
+    slot = _bitmap_slot(address)
+    try:
+        pipeline = get_redis_connection("default").pipeline(transaction=False)
+        if slot is not None:
+            pipeline.getbit(*slot)
+        pipeline.get(cache.make_key(cache_key))
+        *bitmap_hit, cached_result = pipeline.execute()
+    except RedisError:
+        # Redis is only a cache here: fall back to the database.
+        logger.warning("Blocked IP cache lookup failed.", exc_info=True)
+    else:
+        if bitmap_hit and bitmap_hit[0]:
+            return True
+        if cached_result is not None:
+            return bool(cache.client.decode(cached_result))
 
     # Query database if not in cache
     is_blocked = BlockedIP.objects.filter(
         blocked_ip=ip_address, is_blocked=True
     ).exists()
 
-    # Cache the result for 5 minutes
-    cache.set(cache_key, is_blocked, timeout=300)
+    if is_blocked:
+        cache_block_status(ip_address, True)
+    else:
+        # Cache the result for 5 minutes
+        cache.set(cache_key, False, timeout=300)
 
     return is_blocked
 
@@ -36,22 +382,26 @@ def increment_attempts_in_redis(ip_address: str) -> int:
     """
     Safely increments the failed login attempts for a given IP in Redis.
     If the counter for the IP does not exist, it initializes it to 1.
-    Returns the new count of attempts.
+    Returns the new count of attempts, or 0 if Redis is unavailable.
     """
-    key = f"login_attempts:{ip_address}"
+    global _attempts_script
+    key = cache.make_key(f"login_attempts:{ip_address}")
     try:
-        # The `incr` method in django-redis raises a ValueError if the key
-        # does not exist. We handle this to initialize the key.
-        attempts = cache.incr(key)
-    except ValueError:
-        # Key does not exist, so this is the first failed attempt.
-        # We set the key to 1 and apply the expiration time.
-        cache.set(key, 1, timeout=REDIS_EXPIRE_SECONDS)
-        attempts = 1
-    return attempts
+        if _attempts_script is None:
+            # redis-py calls the script by its SHA and reloads it if Redis
+            # lost it.
+            _attempts_script = get_redis_connection("default").register_script(
+                _ATTEMPTS_SCRIPT
+            )
+        return int(_attempts_script(keys=[key], args=[REDIS_EXPIRE_SECONDS]))
+    except RedisError:
+        # Fail open, like the cache-backed counter did when Redis errors were
+        # ignored: the attempt just isn't counted.
+        logger.warning("Failed to count login attempt.", exc_info=True)
+        return 0
 
 
-def reset_attempts_in_redis(ip_address: str):
+def reset_attempts_in_redis(ip_address: str) -> None:
     """
     Clear the attempts counter in Redis for this IP.
     """
@@ -59,7 +409,7 @@ def reset_attempts_in_redis(ip_address: str):
     cache.delete(key)
 
 
-def permanently_block_ip(ip_address: str):
+def permanently_block_ip(ip_address: str) -> None:
     """
     Create or update the block record in the DB. This is your 'permanent' block logic
     until an admin unblocks it.
@@ -73,14 +423,13 @@ def permanently_block_ip(ip_address: str):
         blocked_ip_obj.save()
 
     # Update Redis cache
-    cache_key = f"blocked_ip:{ip_address}"
-    cache.set(cache_key, True, timeout=300)
+    cache_block_status(ip_address, True)
 
     # Reset attempts in Redis
     reset_attempts_in_redis(ip_address)
 
 
-def block_ip(request):
+def block_ip(request: HttpRequest) -> JsonResponse | None:
     """
     Main IP blocking logic. Call this in views that handle sensitive actions.
     """
@@ -0,0 +1,48 @@
+"""
+A small, dependency-free bloom filter.
+
+Used as an in-process pre-check in front of Redis: a negative answer is
+definitive, a positive answer only means "maybe" and must be confirmed by
+the authoritative store.
+"""
+
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    Fixed-size bloom filter backed by a ``bytearray``.
+
+    The filter is sized from the expected number of items and the desired
+    false-positive rate. Bit positions are derived with double hashing over a
+    single 128-bit BLAKE2b digest, so each ``add``/``in`` costs one hash call.
+    """
+
+    def __init__(self, capacity=100_000, error_rate=0.001):
+        capacity = max(int(capacity), 1)
+        # Optimal size/number of hashes for the requested false-positive rate.
+        self.num_bits = max(
+            int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8
+        )
+        self.num_hashes = max(int(round(self.num_bits / capacity * math.log(2))), 1)
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item):
+        if isinstance(item, str):
+            item = item.encode()
+        digest = hashlib.blake2b(item, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        num_bits = self.num_bits
+        return ((h1 + i * h2) % num_bits for i in range(self.num_hashes))
+
+    def add(self, item):
+        """Add an item (``str`` or ``bytes``) to the filter."""
+        bits = self._bits
+        for pos in self._positions(item):
+            bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item):
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
@@ -1,5 +1,14 @@
 from rest_framework.exceptions import Throttled
-from rest_framework.views import exception_handler
+from rest_framework.response import Response
+from rest_framework.views import exception_handler, set_rollback
+
+# Body of every throttled response. The message is generic to avoid leaking the
+# throttle delay (clients get it from Retry-After). The dict is shared between
+# responses, so it must never be mutated.
+THROTTLED_RESPONSE_DATA = {
+    "error": True,
+    "message": "Too many requests. Please try again later.",
+}
 
 
 def custom_exception_handler(exc, context):
@@ -12,22 +21,13 @@ def custom_exception_handler(exc, context):
     For all other exceptions, it falls back to the default DRF exception handler,
     ensuring consistent behavior for validation errors, authentication errors, etc.
     """
-    # First, get the standard error response from the default DRF exception handler.
-    response = exception_handler(exc, context)
-
-    # Now, check if the raised exception is a Throttled exception.
+    # Throttled responses are built here directly: the default handler would
+    # render (and translate) a detail message that we throw away anyway.
     if isinstance(exc, Throttled):
-        # If the default handler has generated a response, we'll override its data.
-        if response is not None:
-            # Create the custom response data in the desired format with a generic message
-            # to avoid leaking information about the throttle delay.
-            custom_data = {
-                "error": True,
-                "message": "Too many requests. Please try again later.",
-            }
-
-            # Replace the default response data with our custom format.
-            response.data = custom_data
+        response = Response(THROTTLED_RESPONSE_DATA, status=exc.status_code)
+        if exc.wait is not None:
+            response["Retry-After"] = "%d" % exc.wait
+        set_rollback()
+        return response
 
-    # Return the response, which is either the modified one or the default one.
-    return response
+    return exception_handler(exc, context)
@@ -1,3 +1,5 @@
+import logging
+
 from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework.response import Response
@@ -7,6 +9,8 @@ from utils.send_email_helper import send_otp
 
 User = get_user_model()
 
+logger = logging.getLogger(__name__)
+
 
 def otp_generator(user: User) -> Response:
     """
@@ -18,10 +22,7 @@ def otp_generator(user: User) -> Response:
     Returns:
         A Django Rest Framework Response object.
     """
-    # Use a more descriptive name for the device since we are sending via email.
-    device, _ = AdvancedOTPDevice.objects.get_or_create(
-        user=user, name="email_otp_device"
-    )
+    device = AdvancedOTPDevice.get_email_device(user)
 
     # Call the model's method to generate the token.
     result = device.generate_token()
@@ -36,11 +37,10 @@ def otp_generator(user: User) -> Response:
 
     # On success, send the OTP via the background task.
     otp_code = result.get("otp_code")
-    print("OTP:", otp_code)
     if otp_code:
-        print("OTP:", otp_code)
+        logger.debug("OTP generated for user %s", user.pk)
         # Send OTP via email using Celery background task for non-blocking operation.
-        # send_otp.delay(user.email, otp_code) # enable to send email
+        send_otp.delay(user.email, otp_code)
     else:
         # This case should ideally not happen if error is False, but it's good practice to handle it.
         return Response(
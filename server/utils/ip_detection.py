@@ -6,26 +6,64 @@ ensuring consistent behavior across all views, middleware, and utilities that ne
 The configuration is centralized here to follow the DRY principle and make maintenance easier.
 """
 
+import functools
+import ipaddress
+import re
+from collections.abc import Mapping
+from typing import Any
+
+from django.http import HttpRequest
 from ipware import get_client_ip
 
 # Headers that ipware will check for client IP (in order of preference).
 # The `ipware` library will automatically fall back to `request.META['REMOTE_ADDR']`
 # if no IP is found in these headers, which is the desired behavior.
-IP_HEADERS = [
+IP_HEADERS = (
     "HTTP_X_FORWARDED_FOR",  # Standard proxy header (set by Next.js proxy)
     "HTTP_X_REAL_IP",  # Common proxy header (set by Next.js proxy)
     "HTTP_CF_CONNECTING_IP",  # Cloudflare
     "HTTP_TRUE_CLIENT_IP",  # Akamai and others
     "HTTP_X_VERCEL_FORWARDED_FOR",  # Vercel
-]
+)
+
+# Left-most (client) entry of a forwarded-for style header. The character class
+# only narrows the candidates; `_parse_ip` decides whether it is really an IP.
+_FORWARDED_IP_RE = re.compile(r"\s*([0-9A-Fa-f:.]+)\s*(?:,|$)")
+_FORWARDED_IP_BYTES_RE = re.compile(rb"\s*([0-9A-Fa-f:.]+)\s*(?:,|$)")
+
+# The same headers as they appear in an ASGI scope (lowercase, dashed, bytes).
+_SCOPE_IP_HEADERS = tuple(
+    header[len("HTTP_") :].lower().replace("_", "-").encode() for header in IP_HEADERS
+)
 
 
-def get_client_ip_address(request):
+@functools.lru_cache(maxsize=4096)
+def _parse_ip(candidate: str) -> tuple[str, bool] | None:
+    """
+    Return `(ip_address, is_routable)` if `candidate` is a valid IPv4/IPv6
+    address, or None so callers fall back to the other detection paths.
+
+    The address is returned in canonical form (e.g. `2001:db8::1` for
+    `2001:DB8::1`), matching what the inet column, the local blocklist and the
+    Redis keys hold.
+    """
+    try:
+        address = ipaddress.ip_address(candidate)
+    except ValueError:
+        return None
+    return str(address), address.is_global
+
+
+def get_client_ip_address(request: HttpRequest) -> tuple[str | None, bool]:
     """
     Extract the client's IP address from the request using centralized configuration.
 
     This function wraps ipware's get_client_ip with our custom header configuration
-    to ensure consistent IP detection across the entire application.
+    to ensure consistent IP detection across the entire application. A
+    well-formed X-Forwarded-For header whose left-most entry is a public
+    address is parsed directly; anything else goes through ipware, which
+    keeps looking through the remaining headers for a public address. The
+    result is memoized on the request, so detection runs once per request.
 
     Args:
         request: Django HttpRequest object
@@ -33,15 +71,35 @@ def get_client_ip_address(request):
     Returns:
         tuple: (ip_address: str, is_routable: bool)
     """
-    return get_client_ip(request, request_header_order=IP_HEADERS)
-
-
-def get_client_ip_only(request):
+    try:
+        return request._client_ip_info
+    except AttributeError:
+        pass
+
+    client_ip_info: tuple[str | None, bool] | None = None
+    forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
+    match = _FORWARDED_IP_RE.match(forwarded_for) if forwarded_for else None
+    if match:
+        parsed = _parse_ip(match.group(1))
+        if parsed is not None and parsed[1]:
+            client_ip_info = parsed
+    if client_ip_info is None:
+        client_ip_info = get_client_ip(request, request_header_order=IP_HEADERS)
+
+    # DRF's Request proxies attribute reads to the wrapped HttpRequest, so
+    # store it there to make it visible from both.
+    getattr(request, "_request", request)._client_ip_info = client_ip_info
+    return client_ip_info
+
+
+def get_client_ip_only(request: HttpRequest) -> str | None:
     """
     Extract only the client's IP address (without routable flag).
 
     This is a convenience function for cases where you only need the IP address
-    and don't care about the routable status.
+    and don't care about the routable status. It shares the memoized result of
+    `get_client_ip_address`, so the middleware and the view share a single
+    detection.
 
     Args:
         request: Django HttpRequest object
@@ -49,11 +107,10 @@ def get_client_ip_only(request):
     Returns:
         str: The client's IP address, or None if not detectable
     """
-    ip_address, _ = get_client_ip_address(request)
-    return ip_address
+    return get_client_ip_address(request)[0]
 
 
-def is_ip_routable(request):
+def is_ip_routable(request: HttpRequest) -> bool:
     """
     Check if the client's IP address is routable (public).
 
@@ -65,11 +122,43 @@ def is_ip_routable(request):
     Returns:
         bool: True if the IP is routable, False otherwise
     """
-    _, is_routable = get_client_ip_address(request)
-    return is_routable
+    return get_client_ip_address(request)[1]
+
+
+def get_client_ip_from_scope(scope: Mapping[str, Any]) -> str | None:
+    """
+    Extract the client's IP address straight from an ASGI connection scope.
+
+    Used by ASGI middleware that runs before Django builds a request object.
+    Checks the same headers as `get_client_ip_address`, in the same order,
+    taking the left-most (client) entry if it is a valid IP address, and
+    falls back to the socket peer.
+
+    Args:
+        scope: ASGI connection scope
+
+    Returns:
+        str: The client's IP address, or None if not detectable
+    """
+    found: dict[bytes, bytes] = {}
+    for name, value in scope.get("headers", ()):
+        if name in _SCOPE_IP_HEADERS and name not in found:
+            found[name] = value
+
+    for name in _SCOPE_IP_HEADERS:
+        value = found.get(name)
+        if value:
+            match = _FORWARDED_IP_BYTES_RE.match(value)
+            if match:
+                parsed = _parse_ip(match.group(1).decode("ascii"))
+                if parsed is not None:
+                    return parsed[0]
+
+    client = scope.get("client")
+    return client[0] if client else None
 
 
-def get_user_agent(request):
+def get_user_agent(request: HttpRequest) -> str:
     """
     Extracts the User-Agent string from the request.
 
@@ -0,0 +1,60 @@
+"""
+In-memory longest-prefix lookup table for blocked IP networks (CIDR ranges).
+"""
+
+import ipaddress
+
+
+class IPPrefixTable:
+    """
+    Set of IPv4/IPv6 networks answering "is this address inside any of them?".
+
+    Networks are bucketed by IP version and prefix length into hash sets of
+    their network addresses. A lookup masks the address once per populated
+    prefix length, so its cost depends on the handful of distinct prefix
+    lengths in use (e.g. /16, /24, /32) rather than on the number of entries.
+
+    Writers swap in a new bucket dict instead of mutating the one readers may
+    be iterating, so lookups stay safe while a background thread updates the
+    table.
+    """
+
+    def __init__(self):
+        self._tables = {4: {}, 6: {}}
+
+    @staticmethod
+    def _parse(network):
+        network = ipaddress.ip_network(network, strict=False)
+        return network.version, network.prefixlen, int(network.network_address)
+
+    def insert(self, network):
+        """Add a network such as ``"10.0.0.0/8"`` (or a single address)."""
+        version, prefixlen, value = self._parse(network)
+        table = dict(self._tables[version])
+        table[prefixlen] = table.get(prefixlen, frozenset()) | {value}
+        self._tables[version] = table
+
+    def delete(self, network):
+        """Remove a network previously added with ``insert``."""
+        version, prefixlen, value = self._parse(network)
+        table = dict(self._tables[version])
+        networks = table.get(prefixlen, frozenset()) - {value}
+        if networks:
+            table[prefixlen] = networks
+        else:
+            table.pop(prefixlen, None)
+        self._tables[version] = table
+
+    def __bool__(self):
+        return bool(self._tables[4] or self._tables[6])
+
+    def __contains__(self, ip_address):
+        """Raises ``ValueError`` if ``ip_address`` is not a valid IP address."""
+        address = ipaddress.ip_address(ip_address)
+        value = int(address)
+        max_prefixlen = address.max_prefixlen
+        for prefixlen, networks in self._tables[address.version].items():
+            shift = max_prefixlen - prefixlen
+            if (value >> shift) << shift in networks:
+                return True
+        return False
@@ -0,0 +1,41 @@
+"""
+Custom Django model fields.
+"""
+
+import ipaddress
+
+from django.core.exceptions import ValidationError
+from django.db import models
+
+
+def validate_ip_network(value):
+    """Accepts a single IP address or a CIDR range, IPv4 or IPv6."""
+    try:
+        ipaddress.ip_network(value, strict=False)
+    except ValueError as e:
+        raise ValidationError(f"Invalid IP address or range: {value}") from e
+
+
+class InetField(models.CharField):
+    """
+    Stores an IP address or CIDR range (e.g. "1.2.3.4" or "1.2.3.0/24").
+
+    On PostgreSQL the column uses the native `inet` type, which is stored in
+    7 or 19 bytes and compared as a network value instead of as text. Other
+    databases fall back to a plain varchar column.
+
+    Values come back as strings, with a "/32" or "/128" suffix on single
+    addresses dropped by PostgreSQL.
+    """
+
+    default_validators = [validate_ip_network]
+
+    def __init__(self, *args, **kwargs):
+        # Longest form: a full IPv6 address plus "/128".
+        kwargs.setdefault("max_length", 43)
+        super().__init__(*args, **kwargs)
+
+    def db_type(self, connection):
+        if connection.vendor == "postgresql":
+            return "inet"
+        return super().db_type(connection)
@@ -3,19 +3,23 @@ Django model mixins for common fields and functionality.
 Provides base fields: UUID ID, created_at, and updated_at.
 """
 
-import uuid
-
 from django.db import models
+from django.utils import timezone
+
+from utils.uuid7 import uuid7
 
 
 class UUIDMixin(models.Model):
     """
     Mixin that adds a UUID primary key field.
+
+    Uses time-ordered UUIDv7 values so new rows are appended to the end of the
+    primary key index.
     """
 
     id = models.UUIDField(
         primary_key=True,
-        default=uuid.uuid4,
+        default=uuid7,
         editable=False,
         verbose_name="Unique identifier",
     )
@@ -29,7 +33,10 @@ class TimestampMixin(models.Model):
     Mixin that adds created_at and updated_at timestamp fields.
     """
 
-    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created at")
+    # Indexed for the default cursor pagination, which seeks on created_at.
+    created_at = models.DateTimeField(
+        auto_now_add=True, db_index=True, verbose_name="Created at"
+    )
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Updated at")
 
     class Meta:
@@ -58,17 +65,36 @@ class SoftDeleteMixin(models.Model):
         """Check if the record is soft deleted."""
         return self.deleted_at is not None
 
+    def _soft_delete_update_fields(self):
+        # Only write the soft delete columns, plus updated_at when the model
+        # has it so auto_now still bumps it.
+        if isinstance(self, TimestampMixin):
+            return ["deleted_at", "updated_at"]
+        return ["deleted_at"]
+
     def soft_delete(self):
         """Soft delete the record by setting deleted_at to current time."""
-        from django.utils import timezone
-
         self.deleted_at = timezone.now()
-        self.save()
+        self.save(update_fields=self._soft_delete_update_fields())
 
     def restore(self):
         """Restore a soft deleted record."""
         self.deleted_at = None
-        self.save()
+        self.save(update_fields=self._soft_delete_update_fields())
+
+    @classmethod
+    def soft_delete_many(cls, pks):
+        """
+        Soft delete the records with the given primary keys in one UPDATE.
+
+        Like ``QuerySet.update``, this skips ``save()`` and model signals.
+        Returns the number of rows updated.
+        """
+        now = timezone.now()
+        fields = {"deleted_at": now}
+        if issubclass(cls, TimestampMixin):
+            fields["updated_at"] = now
+        return cls._default_manager.filter(pk__in=pks).update(**fields)
 
     class Meta:
         abstract = True
@@ -0,0 +1,16 @@
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Keyset pagination ordered by `created_at`, newest first.
+
+    Each page seeks from the last row of the previous one (`WHERE created_at <
+    ...`) using the `created_at` index, instead of `OFFSET n`, which makes the
+    database read and discard every row before the requested page.
+
+    Views that need page numbers can opt back in with
+    `pagination_class = PageNumberPagination`.
+    """
+
+    ordering = "-created_at"
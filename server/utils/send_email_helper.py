@@ -1,31 +1,22 @@
+import smtplib
+import threading
 from pathlib import Path
 
 from django.conf import settings
-from django.core.mail import send_mail
+from django.core.mail import EmailMultiAlternatives, get_connection
 
 from app.celery import app
 
+OTP_EMAIL_SUBJECT = "NEXT-DJANGO - OTP Verification"
 
-@app.task
-def send_otp(to_email, otp):
-    subject = "NEXT-DJANGO - OTP Verification"
-
-    # Load HTML template directly from file system
-    template_path = Path(__file__).parent / "templates" / "sendotp.html"
-
-    try:
-        with open(template_path, "r", encoding="utf-8") as file:
-            html_content = file.read()
-
-        # Replace the OTP placeholder with actual OTP code
-        email_content = html_content.replace("{{OTP_CODE}}", str(otp))
+# Placeholder replaced with the OTP code in the email body.
+OTP_PLACEHOLDER = "{{OTP_CODE}}"
 
-    except FileNotFoundError:
-        # Fallback to simple text email if template not found
-        email_content = f"""
+# Fallback to simple text email if the HTML template is not found
+_FALLBACK_TEMPLATE = f"""
         NEXT-DJANGO - Vehicle Registration & Licenses System
 
-        Your One-Time Password (OTP) is: {otp}
+        Your One-Time Password (OTP) is: {OTP_PLACEHOLDER}
 
         This code will expire in 10 minutes.
 
@@ -45,11 +36,93 @@ def send_otp(to_email, otp):
         Need help? Contact our support team at support@NEXT-DJANGO.gov
         """
 
-    send_mail(
-        subject,
+# Load the HTML template once per worker process instead of on every task.
+_TEMPLATE_PATH = Path(__file__).parent / "templates" / "sendotp.html"
+try:
+    _OTP_TEMPLATE = _TEMPLATE_PATH.read_text(encoding="utf-8")
+except FileNotFoundError:
+    _OTP_TEMPLATE = _FALLBACK_TEMPLATE
+
+# Split once around the placeholder so each email is a concatenation rather
+# than a scan of the whole template.
+_OTP_TEMPLATE_HEAD, _, _OTP_TEMPLATE_TAIL = _OTP_TEMPLATE.partition(OTP_PLACEHOLDER)
+
+
+# Each worker thread keeps its SMTP connection open across tasks, so a burst of
+# OTPs pays for one TCP/TLS handshake. It is recycled after this many messages
+# so it doesn't live on until the server drops it.
+SMTP_CONNECTION_MAX_MESSAGES = 100
+
+_local = threading.local()
+
+
+def _get_connection():
+    connection = getattr(_local, "connection", None)
+    if connection is None or _local.sent >= SMTP_CONNECTION_MAX_MESSAGES:
+        _close_connection()
+        connection = get_connection(fail_silently=False)
+        connection.open()
+        _local.connection = connection
+        _local.sent = 0
+    return connection
+
+
+def _close_connection():
+    connection = getattr(_local, "connection", None)
+    _local.connection = None
+    if connection is not None:
+        try:
+            connection.close()
+        except smtplib.SMTPException:
+            pass
+
+
+def _build_otp_message(to_email, otp, connection):
+    message = EmailMultiAlternatives(
+        OTP_EMAIL_SUBJECT,
         "",
         settings.EMAIL_HOST_USER,
         [to_email],
-        html_message=email_content,
-        fail_silently=False,
+        connection=connection,
     )
+    # Replace the OTP placeholder with actual OTP code
+    message.attach_alternative(
+        f"{_OTP_TEMPLATE_HEAD}{otp}{_OTP_TEMPLATE_TAIL}", "text/html"
+    )
+    return message
+
+
+# An OTP is only valid for 5 minutes (AdvancedOTPDevice.generate_token), so
+# OTP tasks drop the email rather than deliver a code that can no longer be
+# used.
+@app.task(expires=300)
+def send_otp(to_email, otp):
+    message = _build_otp_message(to_email, otp, _get_connection())
+    try:
+        message.send()
+    except smtplib.SMTPServerDisconnected:
+        # The server dropped the idle connection; retry once on a fresh one.
+        _close_connection()
+        message.connection = _get_connection()
+        message.send()
+    _local.sent += 1
+
+
+@app.task(expires=300)
+def send_otp_bulk(recipients, chunk_size=50):
+    """
+    Sends OTP emails to many `(email, otp)` pairs from a single task.
+
+    Each chunk of `chunk_size` messages is sent over one SMTP connection, so
+    bulk sends pay for one broker message and one connection handshake per
+    chunk instead of per recipient.
+    """
+    recipients = list(recipients)
+    for start in range(0, len(recipients), chunk_size):
+        with get_connection(fail_silently=False) as connection:
+            connection.send_messages(
+                [
+                    _build_otp_message(to_email, otp, connection)
+                    for to_email, otp in recipients[start : start + chunk_size]
+                ]
+            )
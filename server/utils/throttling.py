@@ -0,0 +1,83 @@
+"""
+DRF throttles that count requests with one atomic Redis script call.
+
+DRF's stock throttles keep a timestamp history in the Django cache, costing a
+`get` and a `set` round-trip per throttled view and racing under concurrency.
+These drop-in replacements keep the same scopes and rates but use a
+fixed-window counter updated by a Lua script, so every decision is a single
+`EVALSHA`.
+"""
+
+import logging
+
+from django.core.cache import cache
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+from rest_framework import throttling
+
+logger = logging.getLogger(__name__)
+
+# Increments the window's counter, starting the window on its first request.
+# Returns the new count and the seconds left in the window.
+_RATE_LIMIT_SCRIPT = """
+local count = redis.call('INCR', KEYS[1])
+if count == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return {count, redis.call('TTL', KEYS[1])}
+"""
+
+_rate_limit_script = None
+
+
+def _get_rate_limit_script():
+    # redis-py calls the script by its SHA and reloads it if Redis lost it.
+    global _rate_limit_script
+    if _rate_limit_script is None:
+        _rate_limit_script = get_redis_connection("default").register_script(
+            _RATE_LIMIT_SCRIPT
+        )
+    return _rate_limit_script
+
+
+class RedisRateThrottle(throttling.SimpleRateThrottle):
+    """
+    `SimpleRateThrottle` counting requests in Redis with a single script call.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        try:
+            count, self.window_remaining = _get_rate_limit_script()(
+                keys=[cache.make_key(self.key)], args=[self.duration]
+            )
+        except RedisError:
+            # Fail open, like the cache-backed throttles do when Redis errors
+            # are ignored.
+            logger.warning("Rate limit check failed, allowing request.", exc_info=True)
+            return True
+
+        return count <= self.num_requests
+
+    def wait(self):
+        if self.window_remaining < 0:
+            return self.duration
+        return self.window_remaining
+
+
+class AnonRateThrottle(throttling.AnonRateThrottle, RedisRateThrottle):
+    """Limits unauthenticated users by IP."""
+
+
+class UserRateThrottle(throttling.UserRateThrottle, RedisRateThrottle):
+    """Limits authenticated users by user ID."""
+
+
+class ScopedRateThrottle(throttling.ScopedRateThrottle, RedisRateThrottle):
+    """Limits views by their `throttle_scope`."""
@@ -1,8 +1,17 @@
 # crms-next/server/utils/user_agent_parser.py
 
+import functools
+
 import user_agents
 from ua_parser import user_agent_parser
 
+# Production traffic repeats a small set of User-Agent strings (major browsers,
+# bots), so parsed results are cached per process.
+UA_CACHE_SIZE = 4096
+
+# Shared read-only default for missing sections of a ua-parser result.
+_EMPTY = {}
+
 
 def parse_user_agent(request):
     """
@@ -25,17 +34,57 @@ def parse_user_agent(request):
             'device': 'PC'
         }
         Defaults to 'Unknown' or 'Other' if parsing fails.
+
+    The result is memoized on the request, so calling this more than once per
+    request only parses the User-Agent once.
     """
-    ua_string = request.META.get("HTTP_USER_AGENT", "")
+    try:
+        return request._user_agent_info
+    except AttributeError:
+        pass
+
+    browser, os, device = _parse_user_agent(request.META.get("HTTP_USER_AGENT", ""))
+    user_agent_info = {"browser": browser, "os": os, "device": device}
+    # DRF's Request proxies attribute reads to the wrapped HttpRequest, so
+    # store it there to make it visible from both.
+    getattr(request, "_request", request)._user_agent_info = user_agent_info
+    return user_agent_info
+
+
+def _is_pc(ua_string, os_family):
+    """Same rules as `user_agents.parsers.UserAgent.is_pc`."""
+    if "Windows NT" in ua_string or os_family in (
+        "Windows 95",
+        "Windows 98",
+        "Solaris",
+    ):
+        return True
+    if os_family == "Mac OS X" and "Silk" not in ua_string:
+        return True
+    if "Maemo" in ua_string:
+        return False
+    if "Chrome OS" in os_family:
+        return True
+    return "Linux" in ua_string and "X11" in ua_string
+
+
+@functools.lru_cache(maxsize=UA_CACHE_SIZE)
+def _parse_user_agent(ua_string):
+    """Returns `(browser, os, device)` for a User-Agent string."""
     if not ua_string:
-        return {"browser": "Unknown", "os": "Unknown", "device": "Unknown"}
+        return "Unknown", "Unknown", "Unknown"
 
     # Primary parser: ua-parser (good for detailed family info)
     parsed_ua = user_agent_parser.Parse(ua_string)
 
-    browser = parsed_ua.get("user_agent", {}).get("family", "Unknown")
-    os = parsed_ua.get("os", {}).get("family", "Unknown")
-    device = parsed_ua.get("device", {}).get("family", "Other")
+    browser = parsed_ua.get("user_agent", _EMPTY).get("family", "Unknown")
+    os = parsed_ua.get("os", _EMPTY).get("family", "Unknown")
+    device = parsed_ua.get("device", _EMPTY).get("family", "Other")
+
+    # ua-parser reports desktop browsers, the bulk of traffic, as device
+    # "Other". Recognise them up front so they don't need a second parse.
+    if device == "Other" and browser != "Unknown" and _is_pc(ua_string, os):
+        device = "PC"
 
     # Fallback parser: user-agents (good for device type and bot detection)
     if device == "Other" or browser == "Unknown":
@@ -66,8 +115,4 @@ def parse_user_agent(request):
             # If the fallback parser fails, stick with the primary results.
             pass
 
-    return {
-        "browser": browser,
-        "os": os,
-        "device": device,
-    }
+    return browser, os, device
@@ -1,8 +1,21 @@
 from django.core.exceptions import ValidationError
 from PIL import Image
 
+DEFAULT_ALLOWED_EXTENSIONS = frozenset({"jpg", "jpeg", "png"})
+DEFAULT_MAX_SIZE_MB = 5
 
-def validate_image(file, allowed_extensions=None, max_size_mb=5):
+# Leading bytes ("magic numbers") of the accepted image formats, mapped to the
+# PIL format that should decode them.
+_MAGIC = {
+    b"\xff\xd8\xff": "JPEG",
+    b"\x89PNG\r\n\x1a\n": "PNG",
+}
+_MAGIC_HEADER_SIZE = 16
+
+
+def validate_image(
+    file, allowed_extensions=DEFAULT_ALLOWED_EXTENSIONS, max_size_mb=DEFAULT_MAX_SIZE_MB
+):
     """
     Waxa uu kaa caawinaya inu uu kaa hubiyo sawrika
     - Sawirka nuuciisa
@@ -10,10 +23,10 @@ def validate_image(file, allowed_extensions=None, max_size_mb=5):
     """
     # Nuuca Sawirka
     if allowed_extensions is None:
-        allowed_extensions = ["jpg", "jpeg", "png"]
+        allowed_extensions = DEFAULT_ALLOWED_EXTENSIONS
 
     # 1. Nuuca Sawirka
-    ext = file.name.split(".")[-1].lower()
+    ext = file.name.rpartition(".")[2].lower()
     if ext not in allowed_extensions:
         raise ValidationError(f"Incorrect Image Format: .{ext}")
 
@@ -23,9 +36,25 @@ def validate_image(file, allowed_extensions=None, max_size_mb=5):
         raise ValidationError(f"File Size exceedes the limit {max_size_mb} Mb.")
 
     # 3. Sax ahaanshaha sawirka
+    # Sniff the first bytes so non-images are rejected without handing the
+    # upload to PIL; the file is rewound for whoever reads it next.
     try:
-        img = Image.open(file)
-        img.verify()  # sawir corrpt ah inu yahay
+        head = file.read(_MAGIC_HEADER_SIZE)
+    finally:
+        file.seek(0)
+    image_format = next(
+        (fmt for magic, fmt in _MAGIC.items() if head.startswith(magic)), None
+    )
+    if image_format is None:
+        raise ValidationError("Invalid Image.")
+
+    try:
+        # Only let PIL try the plugin for the sniffed format.
+        with Image.open(file, formats=(image_format,)) as img:
+            img.verify()  # sawir corrpt ah inu yahay
 
     except Exception as e:
         raise ValidationError("Invalid Image.") from e
+
+    finally:
+        file.seek(0)